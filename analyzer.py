@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import openai
+import pandas as pd
+
+from prompts import build_messages, get_prompt
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl 미지원 환경
+    fcntl = None
+
+# 워커 프로세스(spawn)에서도 임포트되므로 이 모듈은 streamlit에 의존하지 않는다.
+
+CATEGORIES = ['BM', '기술', '운영', 'UX', '콘텐츠']
+
+
+# 응답 파싱 (프롬프트는 prompts.py 레지스트리에서 관리)
+def parse_category(out):
+    out = out.strip()
+    return out if out in CATEGORIES else '기타'
+
+
+def parse_urgency(out):
+    try:
+        out = out.strip()
+        if out.startswith("```"):
+            out = out.split("```")[1].strip()
+        out = out.replace("'", "\"")
+        json_start = out.find("{")
+        json_end = out.rfind("}") + 1
+        js = json.loads(out[json_start:json_end])
+        return float(js.get('urgency', 0.0)), js.get('reason', '분석실패')
+    except Exception:
+        return 0.5, "분석실패"
+
+
+class FileRateLimiter:
+    """여러 프로세스가 하나의 잠금 파일로 공유하는 전역 요청 속도 제한기.
+
+    파일에는 다음 요청이 허용되는 시각이 기록되며, 각 요청은 flock으로 잠근 상태에서
+    자기 슬롯을 예약한 뒤 해당 시각까지 대기한다. rps가 None이면 제한하지 않는다.
+    """
+
+    def __init__(self, path, rps):
+        self.path = path
+        self.interval = 1.0 / rps if rps else 0.0
+        self._next = 0.0  # fcntl 미지원 시 프로세스 로컬 상태
+
+    def _reserve(self):
+        now = time.time()
+        if fcntl is None:
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+            return slot - now
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read().strip()
+                slot = max(now, float(raw) if raw else 0.0)
+                f.seek(0)
+                f.truncate()
+                f.write(repr(slot + self.interval))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return slot - now
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# 재시도 대상 오류: 일시적인 속도 제한 · 타임아웃 · 연결 끊김 · 서버 오류 (APITimeoutError는 APIConnectionError의 하위 클래스)
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+# 실행 전체를 중단해야 하는 오류: 키 · 권한 · 모델 설정 문제는 어느 행에서나 똑같이 실패한다
+FATAL_ERRORS = (openai.AuthenticationError, openai.PermissionDeniedError, openai.NotFoundError)
+
+
+class AnalysisError(RuntimeError):
+    """재시도로 복구할 수 없는 API 오류. 워커 프로세스에서도 안전하게 전달되도록 메시지만 담는다."""
+
+
+async def _analyze_rows(rows, options, on_row=None):
+    # 재시도는 아래에서 직접 처리하므로 클라이언트 자체 재시도는 끈다
+    client = openai.AsyncOpenAI(api_key=options['api_key'], base_url=options.get('base_url'), max_retries=0)
+    limiter = FileRateLimiter(options['limiter_path'], options.get('rps'))
+    semaphore = asyncio.Semaphore(options.get('concurrency', 16))
+    max_retries = options.get('max_retries', 5)
+
+    category_spec = get_prompt('category')
+    urgency_spec = get_prompt('urgency')
+
+    async def complete(spec, **fields):
+        for attempt in range(max_retries + 1):
+            try:
+                async with semaphore:
+                    await limiter.acquire()
+                    resp = await client.chat.completions.create(
+                        model=spec['model'],
+                        messages=build_messages(spec, **fields),
+                        temperature=spec['temperature'],
+                        max_tokens=spec['max_tokens']
+                    )
+                return resp.choices[0].message.content
+            except RETRYABLE_ERRORS:
+                if attempt == max_retries:
+                    raise
+                # 지수 백오프 + 지터 (최대 30초)
+                await asyncio.sleep(min(30.0, 2 ** attempt) * (0.5 + random.random() / 2))
+
+    async def analyze(content, score, thumbs):
+        # 요청이 실패했거나 응답을 해석하지 못한 행은 failed=True
+        try:
+            category = parse_category(await complete(category_spec, content=content))
+            urgency, reason = parse_urgency(await complete(urgency_spec, content=content, score=score, thumbs=thumbs))
+            failed = reason == "분석실패"
+        except FATAL_ERRORS:
+            raise
+        except openai.APIError:
+            # 재시도 후에도 남은 일시적 오류나 행 단위 요청 오류(너무 긴 리뷰, 콘텐츠 필터 등)는 해당 행만 실패 처리
+            category, urgency, reason, failed = '기타', 0.5, "분석실패", True
+        if on_row:
+            on_row()
+        return category, urgency, reason, failed
+
+    try:
+        return await asyncio.gather(*(analyze(*row) for row in rows))
+    except FATAL_ERRORS as e:
+        raise AnalysisError(f"{type(e).__name__}: {e}") from None
+    finally:
+        await client.close()
+
+
+def _analyze_shard(shard_idx, rows, options, on_row=None):
+    # 워커 프로세스 진입점: 샤드마다 자체 이벤트 루프와 비동기 클라이언트 풀을 사용
+    return shard_idx, asyncio.run(_analyze_rows(rows, options, on_row))
+
+
+def _shard_fingerprint(rows):
+    # 샤드 입력과 분석 프롬프트가 같을 때만 체크포인트를 재사용한다
+    payload = json.dumps([rows, get_prompt('category'), get_prompt('urgency')], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _load_checkpoint(checkpoint_dir, idx, rows):
+    path = os.path.join(checkpoint_dir, f"shard_{idx:06d}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    if saved['fingerprint'] != _shard_fingerprint(rows):
+        return None
+    return [tuple(r) for r in saved['results']]
+
+
+def _save_checkpoint(checkpoint_dir, idx, rows, shard_result):
+    path = os.path.join(checkpoint_dir, f"shard_{idx:06d}.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({'fingerprint': _shard_fingerprint(rows), 'results': shard_result}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def analyze_reviews(df, api_key, workers=None, chunk_size=2000, concurrency=16,
+                    rps=None, base_url=None, max_retries=5, checkpoint_dir=None, on_progress=None):
+    """리뷰 프레임에 category / urgency / reason 컬럼을 채운 복사본과 실패 행 수를 반환한다.
+
+    프레임을 chunk_size 단위 샤드로 나눠 ProcessPoolExecutor에 분배하고, 결과는
+    원래 행 순서대로 병합한다. rps는 모든 워커를 합친 초당 요청 수 상한이다.
+    속도 제한 · 타임아웃 · 연결 · 서버 오류는 백오프로 재시도하고, 그래도 실패했거나
+    행 단위 요청 오류가 난 행은 실패 수에 포함된다. 인증 · 권한 · 모델 없음 오류는
+    남은 샤드를 취소하고 AnalysisError로 전파된다.
+    checkpoint_dir을 주면 완료된 샤드를 저장해 두고, 다시 실행할 때 입력과 프롬프트가
+    같은 샤드는 API 호출 없이 재사용한다.
+    on_progress(완료 행 수, 전체 행 수)로 진행률을 전달한다 (단일 프로세스에서는 행 단위,
+    멀티 프로세스에서는 샤드 단위).
+    """
+    rows = list(zip(
+        df['content'].astype(str),
+        df['score'].astype(str),
+        df['thumbsUpCount'].astype(str)
+    ))
+    shards = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    results = [None] * len(shards)
+    done = 0
+
+    def report(count):
+        nonlocal done
+        done += count
+        if on_progress:
+            on_progress(done, len(rows))
+
+    def shard_done(idx, shard_result):
+        results[idx] = shard_result
+        # 실패 행이 있는 샤드는 다음 실행에서 다시 분석하도록 저장하지 않는다
+        if checkpoint_dir and not any(r[3] for r in shard_result):
+            _save_checkpoint(checkpoint_dir, idx, shards[idx], shard_result)
+
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        for idx, shard in enumerate(shards):
+            results[idx] = _load_checkpoint(checkpoint_dir, idx, shard)
+            if results[idx] is not None:
+                report(len(shard))
+    pending = [idx for idx, shard_result in enumerate(results) if shard_result is None]
+    workers = min(workers or os.cpu_count() or 1, len(pending)) or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        options = {
+            'api_key': api_key,
+            'base_url': base_url,
+            'concurrency': concurrency,
+            'max_retries': max_retries,
+            # fcntl이 없으면 파일 공유가 불가능하므로 워커별로 상한을 나눠 가진다
+            'rps': rps / workers if rps and fcntl is None else rps,
+            'limiter_path': os.path.join(tmp, "ratelimit"),
+        }
+        if workers == 1:
+            for idx in pending:
+                shard_done(idx, _analyze_shard(idx, shards[idx], options, lambda: report(1))[1])
+        else:
+            # Streamlit 서버 프로세스를 fork하지 않도록 spawn 컨텍스트 사용
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(_analyze_shard, idx, shards[idx], options) for idx in pending]
+                try:
+                    for future in as_completed(futures):
+                        idx, shard_result = future.result()
+                        shard_done(idx, shard_result)
+                        report(len(shard_result))
+                except BaseException:
+                    # 대기 중인 샤드가 계속 API를 호출하지 않도록 취소 후 전파
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+
+    merged = [r for shard_result in results for r in shard_result]
+    out = df.copy()
+    out['category'] = [r[0] for r in merged]
+    out['urgency'] = [r[1] for r in merged]
+    out['reason'] = [r[2] for r in merged]
+    return out, sum(r[3] for r in merged)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="리뷰 CSV 대량 분석 (멀티프로세스 샤딩)")
+    parser.add_argument("input", help="입력 CSV (필수 컬럼: content, score, thumbsUpCount)")
+    parser.add_argument("-o", "--output", required=True, help="결과 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--limit", type=int, help="앞에서부터 분석할 리뷰 개수")
+    parser.add_argument("--workers", type=int, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="샤드당 리뷰 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="워커당 동시 요청 수")
+    parser.add_argument("--rps", type=float, help="전체 워커 합산 초당 요청 수 상한")
+    parser.add_argument("--base-url", help="OpenAI 호환 API 주소")
+    parser.add_argument("--max-retries", type=int, default=5, help="속도 제한 · 타임아웃 · 연결 오류 시 재시도 횟수")
+    parser.add_argument(
+        "--checkpoint-dir",
+        help="완료된 샤드 저장 위치 (기본: <output>.shards, 모든 행이 성공하면 삭제)"
+    )
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, encoding=args.encoding)
+    if args.limit:
+        df = df.head(args.limit)
+
+    checkpoint_dir = args.checkpoint_dir or f"{args.output}.shards"
+    started = time.time()
+
+    def report(done, total):
+        elapsed = time.time() - started
+        print(f"\r{done:,}/{total:,} 리뷰 분석 ({done / max(elapsed, 1e-9):.1f} 리뷰/초)", end="", flush=True)
+
+    try:
+        result, failed = analyze_reviews(
+            df,
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            base_url=args.base_url,
+            max_retries=args.max_retries,
+            checkpoint_dir=checkpoint_dir,
+            on_progress=report
+        )
+    except AnalysisError as e:
+        print()
+        parser.exit(1, f"분석 중단: {e}\n완료된 샤드는 {checkpoint_dir}에 저장되어 다시 실행하면 이어서 분석합니다.\n")
+    print()
+    if args.output.endswith(".parquet"):
+        result.to_parquet(args.output, index=False)
+    else:
+        result.to_csv(args.output, index=False, encoding="utf-8-sig")
+    if failed:
+        print(f"⚠️ {failed:,}개 리뷰 분석 실패 (reason='분석실패'), 다시 실행하면 실패한 샤드만 재분석합니다", file=sys.stderr)
+        sys.exit(1)
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,15 @@ import openai
 import json
 import plotly.express as px
 import plotly.graph_objects as go
+import hashlib
+import io
+import time
 from datetime import datetime
 
+from analyzer import AnalysisError, analyze_reviews
+from prompts import REPLY_STYLE_GUIDES, REPLY_STYLES, build_messages, get_prompt
+from export import EXPORT_FORMATS, EXPORT_TTL, ROW_ID, append_reply, delete_results, export_results, load_replies, load_results, save_results
+
 # 페이지 설정
 st.set_page_config(
     page_title="리뷰케어 대시보드", 
@@ -14,6 +21,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 재실행(rerun) 소요 시간 측정 시작
+rerun_started = time.perf_counter()
+
 # 커스텀 CSS 스타일
 st.markdown("""
 <style>
@@ -148,6 +158,7 @@ st.markdown("""
 
 # API 키 설정
 OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
+DEBUG = st.secrets.get("DEBUG", False)
 openai.api_key = OPENAI_API_KEY
 
 # 헤더
@@ -182,82 +193,42 @@ with st.sidebar:
         st.markdown("### 🎨 스타일 설정")
         answer_style = st.selectbox(
             "답변 스타일",
-            ['공감 중심', '문제 원인 상세', '고객센터 안내'],
+            REPLY_STYLES,
             help="생성될 답변의 톤앤매너를 선택하세요"
         )
+        
+        st.markdown("### ⚙️ 실행 설정")
+        rps = st.number_input(
+            "초당 요청 수 상한 (RPS)",
+            min_value=1,
+            max_value=500,
+            value=8,
+            help="모든 워커가 공유하는 OpenAI API 초당 요청 수 상한입니다"
+        )
+        reanalyze = st.button(
+            "🔄 다시 분석",
+            use_container_width=True,
+            help="저장된 분석 결과를 버리고 현재 프롬프트로 다시 분석합니다"
+        )
 
-def read_csv_with_encoding(file):
+# 업로드 파일 내용(bytes)을 키로 캐시하므로 같은 파일이면 재실행마다 CSV 파싱 · 날짜 변환을 다시 하지 않는다
+@st.cache_data(show_spinner=False)
+def read_csv_with_encoding(data):
     for enc in ["utf-8-sig", "utf-8", "cp949", "euc-kr", "latin1"]:
         try:
-            file.seek(0)
-            df = pd.read_csv(file, encoding=enc)
+            df = pd.read_csv(io.BytesIO(data), encoding=enc)
             if not df.empty:
-                return df
+                break
         except Exception:
             continue
-    st.error("❌ CSV 파일을 읽을 수 없습니다.")
-    return None
-
-@st.cache_data(show_spinner=False)
-def extract_category(contents):
-    cat_list = []
-    for content in contents:
-        prompt = (
-            "너는 게임 CS 담당자다. 아래 리뷰에 대해 문제의 범주(category)를 'BM', '기술', '운영', 'UX', '콘텐츠' 중 가장 적합한 한 단어로만 반환해라. "
-            "카테고리 외 설명, 문장, 마침표 없이 딱 한 단어만. "
-            f"리뷰: \"{content}\""
-        )
-        resp = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "카테고리 단어만 반환"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=10
-        )
-        out = resp.choices[0].message.content.strip()
-        if out not in ['BM', '기술', '운영', 'UX', '콘텐츠']:
-            out = '기타'
-        cat_list.append(out)
-    return cat_list
+    else:
+        return None
 
-def get_llm_urgency(row):
-    content = str(row['content'])
-    score = str(row['score'])
-    thumbs = str(row['thumbsUpCount'])
-    prompt = (
-        "너는 숙련된 게임 CS 분석가다. 아래 게임 리뷰의 전체 내용을 꼼꼼히 읽고, "
-        "별점과 추천수, 그리고 리뷰의 전반적인 맥락과 표현을 바탕으로 '이 리뷰가 게임사에 얼마나 시급하게 대응되어야 할지'를 객관적으로 평가해라. "
-        "특정 키워드가 없어도 맥락상 서비스 안정성, 신뢰성, 금전적 피해, 다수 이용자의 불편, 반복적 신고, 감정적 호소 등 여러 요인을 종합적으로 고려해 시급도를 판단해라. "
-        "별점이 낮거나 추천수가 높거나, 혹은 본문에서 긴급성이 느껴지면 높은 점수를 주고, 단순 의견 또는 반복 이슈가 아니면 낮은 점수를 주라. "
-        "결과는 반드시 아래 예시처럼 JSON만 반환해라. "
-        "예시: {\"urgency\":0.97,\"reason\":\"1점 리뷰에 많은 추천수가 있고, 환불을 강하게 요청함\"} "
-        "예시: {\"urgency\":0.5,\"reason\":\"게임 시스템 건의로, 긴급 대응 필요는 낮음\"} "
-        "코드블록, 설명, 다른 문구 없이 JSON만 반환.\n"
-        f"리뷰 평점: {score}★, 추천수: {thumbs}\n리뷰: \"{content}\""
-    )
-    try:
-        resp = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "예시처럼 JSON만 반환"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.11,
-            max_tokens=200
-        )
-        out = resp.choices[0].message.content.strip()
-        if out.startswith("```"):
-            out = out.split("```")[1].strip()
-        out = out.replace("'", "\"")
-        json_start = out.find("{")
-        json_end = out.rfind("}") + 1
-        out = out[json_start:json_end]
-        js = json.loads(out)
-        return js.get('urgency', 0.0), js.get('reason', '분석실패')
-    except Exception:
-        return 0.5, "분석실패"
+    if 'at' in df.columns:
+        df['at'] = pd.to_datetime(df['at'], errors='coerce')
+    else:
+        df['at'] = pd.Timestamp.now()
+    return df
 
 def get_urgency_class(urgency):
     if urgency >= 0.7:
@@ -278,17 +249,241 @@ def get_category_class(category):
     }
     return category_classes.get(category, 'cat-etc')
 
+# 통계 뷰 빌더: 분석 결과 프레임의 해시(result_key)를 키로 캐시하므로 결과가 바뀔 때만 다시 계산된다.
+# (_preview는 언더스코어 접두어로 해시 대상에서 제외)
+@st.cache_data(show_spinner=False)
+def build_basic_figures(result_key, _preview):
+    preview = _preview
+    
+    # 별점 분포
+    score_counts = preview['score'].value_counts().sort_index()
+    fig_score = px.bar(
+        x=score_counts.index, 
+        y=score_counts.values,
+        title="⭐ 별점 분포",
+        labels={'x': '별점', 'y': '리뷰 수'},
+        color=score_counts.values,
+        color_continuous_scale='RdYlGn_r'
+    )
+    fig_score.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 카테고리 분포
+    cat_counts = preview['category'].value_counts()
+    fig_cat = px.pie(
+        values=cat_counts.values,
+        names=cat_counts.index,
+        title="📂 문제 범주 분포",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig_cat.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 긴급도 히스토그램
+    fig_urgency = px.histogram(
+        preview, 
+        x='urgency', 
+        nbins=20,
+        title="🚨 긴급도 분포",
+        labels={'urgency': '긴급도', 'count': '리뷰 수'},
+        color_discrete_sequence=['#667eea']
+    )
+    fig_urgency.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    return fig_score, fig_cat, fig_urgency
+
+@st.cache_data(show_spinner=False)
+def build_date_figures(result_key, _preview):
+    # 날짜 데이터 처리
+    preview_with_date = _preview.copy()
+    preview_with_date['date'] = pd.to_datetime(preview_with_date['at']).dt.date
+    preview_with_date['hour'] = pd.to_datetime(preview_with_date['at']).dt.hour
+    preview_with_date['weekday'] = pd.to_datetime(preview_with_date['at']).dt.day_name()
+    
+    # 일별 리뷰 수 및 평균 긴급도
+    daily_stats = preview_with_date.groupby('date').agg({
+        'urgency': ['count', 'mean'],
+        'score': 'mean'
+    }).round(2)
+    daily_stats.columns = ['리뷰_수', '평균_긴급도', '평균_별점']
+    daily_stats = daily_stats.reset_index()
+    
+    # 일별 리뷰 수와 긴급도
+    fig_daily = go.Figure()
+    fig_daily.add_trace(go.Scatter(
+        x=daily_stats['date'],
+        y=daily_stats['리뷰_수'],
+        mode='lines+markers',
+        name='리뷰 수',
+        line=dict(color='#667eea', width=3),
+        yaxis='y'
+    ))
+    fig_daily.add_trace(go.Scatter(
+        x=daily_stats['date'],
+        y=daily_stats['평균_긴급도'],
+        mode='lines+markers',
+        name='평균 긴급도',
+        line=dict(color='#ff6b6b', width=3),
+        yaxis='y2'
+    ))
+    fig_daily.update_layout(
+        title="📅 일별 리뷰 수 & 평균 긴급도",
+        xaxis_title="날짜",
+        yaxis=dict(title="리뷰 수", side="left"),
+        yaxis2=dict(title="평균 긴급도", side="right", overlaying="y"),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 요일별 분포
+    weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    weekday_korean = ['월', '화', '수', '목', '금', '토', '일']
+    weekday_stats = preview_with_date.groupby('weekday')['urgency'].agg(['count', 'mean']).round(2)
+    weekday_stats = weekday_stats.reindex(weekday_order)
+    weekday_stats['weekday_kr'] = weekday_korean
+    
+    fig_weekday = px.bar(
+        x=weekday_stats['weekday_kr'],
+        y=weekday_stats['count'],
+        title="📆 요일별 리뷰 수",
+        labels={'x': '요일', 'y': '리뷰 수'},
+        color=weekday_stats['mean'],
+        color_continuous_scale='Reds'
+    )
+    fig_weekday.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 시간대별 분포
+    hourly_stats = preview_with_date.groupby('hour').agg({
+        'urgency': ['count', 'mean']
+    }).round(2)
+    hourly_stats.columns = ['리뷰_수', '평균_긁급도']
+    hourly_stats = hourly_stats.reset_index()
+    
+    fig_hourly = px.line(
+        hourly_stats,
+        x='hour',
+        y='리뷰_수',
+        title="🕐 시간대별 리뷰 분포",
+        labels={'hour': '시간', '리뷰_수': '리뷰 수'},
+        markers=True
+    )
+    fig_hourly.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 날짜별 카테고리 히트맵
+    fig_heatmap = None
+    if len(daily_stats) > 1:
+        date_category = preview_with_date.groupby(['date', 'category']).size().unstack(fill_value=0)
+        
+        fig_heatmap = px.imshow(
+            date_category.T,
+            title="🗓️ 날짜별 카테고리 분포 히트맵",
+            labels=dict(x="날짜", y="카테고리", color="리뷰 수"),
+            color_continuous_scale='Blues'
+        )
+        fig_heatmap.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_family="Arial"
+        )
+    return fig_daily, fig_weekday, fig_hourly, fig_heatmap
+
+@st.cache_data(show_spinner=False)
+def build_deep_figures(result_key, _preview):
+    preview = _preview.copy()
+    
+    # 카테고리별 긴급도 박스플롯
+    fig_box = px.box(
+        preview,
+        x='category',
+        y='urgency',
+        title="📊 카테고리별 긴급도 분포",
+        labels={'category': '카테고리', 'urgency': '긴급도'},
+        color='category',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig_box.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 카테고리별 평균 지표
+    category_stats = preview.groupby('category').agg({
+        'urgency': 'mean',
+        'score': 'mean',
+        'thumbsUpCount': 'mean'
+    }).round(2)
+    
+    # 별점 vs 긴급도 산점도
+    fig_scatter = px.scatter(
+        preview,
+        x='score',
+        y='urgency',
+        size='thumbsUpCount',
+        color='category',
+        title="⭐ 별점 vs 긴급도 관계",
+        labels={'score': '별점', 'urgency': '긴급도', 'thumbsUpCount': '추천수'},
+        hover_data=['category']
+    )
+    fig_scatter.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    
+    # 추천수 구간별 분석
+    preview['thumbs_range'] = pd.cut(
+        preview['thumbsUpCount'], 
+        bins=[0, 10, 50, 100, float('inf')], 
+        labels=['~10', '11~50', '51~100', '100+']
+    )
+    
+    thumbs_stats = preview.groupby('thumbs_range').agg({
+        'urgency': 'mean',
+        'score': 'mean'
+    }).round(2)
+    
+    fig_thumbs = px.bar(
+        x=thumbs_stats.index,
+        y=thumbs_stats['urgency'],
+        title="👍 추천수 구간별 평균 긴급도",
+        labels={'x': '추천수 구간', 'y': '평균 긴급도'},
+        color=thumbs_stats['urgency'],
+        color_continuous_scale='Reds'
+    )
+    fig_thumbs.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_family="Arial"
+    )
+    return fig_box, category_stats, fig_scatter, fig_thumbs
+
 if uploaded_file:
-    df = read_csv_with_encoding(uploaded_file)
+    df = read_csv_with_encoding(uploaded_file.getvalue())
+    if df is None:
+        st.error("❌ CSV 파일을 읽을 수 없습니다.")
     
     if df is None or df.empty or 'content' not in df.columns or 'score' not in df.columns or 'thumbsUpCount' not in df.columns:
         st.error("❌ 필수 컬럼이 없습니다. (필수: content, score, thumbsUpCount, at)")
         st.stop()
-    
-    if 'at' in df.columns:
-        df['at'] = pd.to_datetime(df['at'], errors='coerce')
-    else:
-        df['at'] = pd.Timestamp.now()
 
     # 메트릭 카드들
     col1, col2, col3 = st.columns(3)
@@ -318,42 +513,81 @@ if uploaded_file:
         </div>
         """, unsafe_allow_html=True)
 
-    # 분석 시작
-    with st.spinner("🤖 AI가 리뷰를 분석하고 있습니다..."):
-        preview = df.head(N).copy()
-        
-        # 진행률 표시
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # 카테고리 분석
-        status_text.text("📂 카테고리 분류 중...")
-        preview['category'] = extract_category(preview['content'])
-        progress_bar.progress(50)
-        
-        # 긴급도 분석
-        status_text.text("🚨 긴급도 분석 중...")
-        urg, reasons = [], []
-        for i, (_, row) in enumerate(preview.iterrows()):
-            u, r = get_llm_urgency(row)
-            urg.append(u)
-            reasons.append(r)
-            progress_bar.progress(50 + (i + 1) * 50 // len(preview))
+    # 분석 시작 (같은 입력이면 세션에 저장된 결과 재사용)
+    preview = df.head(N).copy()
+    preview.insert(0, ROW_ID, range(len(preview)))
+    # 입력 데이터(값 · 컬럼명)와 함께 분석 프롬프트 스펙도 키에 포함해, 프롬프트 버전 · 모델 · 파라미터가 바뀌면 새로 분석한다
+    prompt_fingerprint = json.dumps(
+        [list(preview.columns), get_prompt('category'), get_prompt('urgency')], sort_keys=True, ensure_ascii=False
+    )
+    analysis_key = hashlib.sha1(
+        pd.util.hash_pandas_object(preview, index=False).values.tobytes() + prompt_fingerprint.encode("utf-8")
+    ).hexdigest()
+    
+    if reanalyze:
+        delete_results(analysis_key)
+    
+    if reanalyze or st.session_state.get('analysis_key') != analysis_key:
+        # 이전에 저장된 같은 입력의 분석 결과가 있으면 API 호출 없이 재사용 (실패 없는 결과만 저장됨)
+        saved = load_results(analysis_key)
+        if saved is not None:
+            preview, failed = saved, 0
+        else:
+            with st.spinner("🤖 AI가 리뷰를 분석하고 있습니다..."):
+                # 진행률 표시
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                status_text.text("📂 카테고리 분류 · 🚨 긴급도 분석 중...")
+            
+                try:
+                    preview, failed = analyze_reviews(
+                        preview,
+                        api_key=OPENAI_API_KEY,
+                        # 대시보드는 최대 50개만 분석하므로 단일 프로세스의 비동기 요청으로 충분하다
+                        # (대량 분석은 analyzer.py CLI의 --workers 사용)
+                        workers=1,
+                        rps=rps,
+                        on_progress=lambda done, total: progress_bar.progress(done * 100 // total)
+                    )
+                except AnalysisError as e:
+                    status_text.empty()
+                    st.error(f"❌ 리뷰 분석 중 API 오류가 발생했습니다: {e}")
+                    st.stop()
+                progress_bar.progress(100)
+                status_text.text("✅ 분석 완료!")
+            # 실패한 행이 있는 결과는 재사용되지 않도록 저장하지 않는다
+            if not failed:
+                save_results(analysis_key, preview)
         
-        preview['urgency'] = urg
-        preview['reason'] = reasons
-        progress_bar.progress(100)
-        status_text.text("✅ 분석 완료!")
+        st.session_state.analysis_key = analysis_key
+        st.session_state.analysis_result = preview
+        st.session_state.analysis_failed = failed
+        # 입력 · 프롬프트가 같아도 다시 분석하면 결과가 달라질 수 있으므로 그림 캐시는 결과 자체로 키를 만든다
+        st.session_state.result_key = hashlib.sha1(
+            pd.util.hash_pandas_object(preview, index=False).values.tobytes()
+        ).hexdigest()
     
+    preview = st.session_state.analysis_result
+    if st.session_state.analysis_failed:
+        st.warning(
+            f"⚠️ {st.session_state.analysis_failed}개 리뷰는 분석에 실패해 기본값(긴급도 0.5, '분석실패')으로 표시됩니다. "
+            "이 결과는 저장되지 않으며, 사이드바의 '다시 분석'으로 재시도할 수 있습니다."
+        )
     preview = preview.sort_values('urgency', ascending=False).reset_index(drop=True)
     criticals = preview.head(10)
     
     st.markdown("## 🚨 긴급도 상위 리뷰 Top 10")
     
-    # 탭으로 구분
-    tab1, tab2, tab3 = st.tabs(["📋 리뷰 목록", "💬 답변 생성", "📊 통계 분석"])
+    # 뷰 선택: 선택된 뷰만 실행되므로 숨겨진 화면의 집계·차트 비용이 들지 않는다
+    view = st.radio(
+        "보기",
+        ["📋 리뷰 목록", "💬 답변 생성", "📊 통계 분석", "📥 내보내기"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_view"
+    )
     
-    with tab1:
+    if view == "📋 리뷰 목록":
         for idx, row in criticals.iterrows():
             urgency_class = get_urgency_class(row['urgency'])
             category_class = get_category_class(row['category'])
@@ -383,7 +617,7 @@ if uploaded_file:
             </div>
             """, unsafe_allow_html=True)
     
-    with tab2:
+    elif view == "💬 답변 생성":
         st.markdown("### 💬 AI 답변 생성기")
         
         # 선택된 리뷰 표시
@@ -412,7 +646,7 @@ if uploaded_file:
             st.markdown("#### 🎨 답변 스타일 선택")
             selected_style = st.radio(
                 "스타일을 선택하세요:",
-                ['공감 중심', '문제 원인 상세', '고객센터 안내'],
+                REPLY_STYLES,
                 horizontal=False,
                 help="답변의 톤앤매너를 선택하세요"
             )
@@ -422,31 +656,21 @@ if uploaded_file:
             if st.button("AI 답변 생성", use_container_width=True, type="primary"):
                 review_content = str(selected_review['content'])
                 
-                style_dict = {
-                    '공감 중심': '이용자의 감정에 최대한 공감하고 불편을 인정하는 답변',
-                    '문제 원인 상세': '문제 원인에 대해 상세히 설명하는 답변',
-                    '고객센터 안내': '문제를 고객센터에서 도와드릴 수 있다는 안내를 중심으로 작성'
-                }
-                
-                prompt = (
-                    f"리뷰: \"{review_content}\"\n"
-                    f"답변 스타일: {style_dict[selected_style]}\n"
-                    "위 리뷰에 대해 CS 담당자 입장에서 공식적이고 중립적으로 답변하라. "
-                    "공감, 사과, 해결방안, 후속 안내를 포함하며, "
-                    "'현질', '현금박치기', '쪼렙', '오지게' 등 은어·비속어·비공식/은유적 표현은 반드시 '유료 결제', '과금', '유료 아이템 구매', '초보자', '매우' 등 공식적이고 중립적인 용어로 순화하여 답변하라."
-                )
+                reply_spec = get_prompt('reply')
                 
                 with st.spinner("🤖 답변 생성 중..."):
                     resp = openai.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {"role": "system", "content": "너는 게임 CS 담당자이며 답변 시 반드시 비공식어를 순화할 것."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.1,
-                        max_tokens=500
+                        model=reply_spec['model'],
+                        messages=build_messages(
+                            reply_spec,
+                            content=review_content,
+                            style_guide=REPLY_STYLE_GUIDES[selected_style]
+                        ),
+                        temperature=reply_spec['temperature'],
+                        max_tokens=reply_spec['max_tokens']
                     )
                     answer = resp.choices[0].message.content
+                    append_reply(analysis_key, selected_review[ROW_ID], selected_style, answer)
                     
                     st.markdown("#### 📋 생성된 답변")
                     st.text_area(
@@ -456,206 +680,50 @@ if uploaded_file:
                         help="생성된 답변을 복사하여 사용하세요"
                     )
     
-    with tab3:
+    elif view == "📊 통계 분석":
         st.markdown("### 📊 분석 결과 통계")
         
-        # 서브탭으로 구분
-        subtab1, subtab2, subtab3 = st.tabs(["📈 기본 통계", "📅 날짜별 분석", "🔍 심화 분석"])
+        # 서브뷰 선택
+        stats_view = st.radio(
+            "통계 보기",
+            ["📈 기본 통계", "📅 날짜별 분석", "🔍 심화 분석"],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="stats_view"
+        )
         
-        with subtab1:
-            col1, col2 = st.columns(2)
+        if stats_view == "📈 기본 통계":
+            fig_score, fig_cat, fig_urgency = build_basic_figures(st.session_state.result_key, preview)
             
+            col1, col2 = st.columns(2)
             with col1:
-                # 별점 분포
-                score_counts = preview['score'].value_counts().sort_index()
-                fig_score = px.bar(
-                    x=score_counts.index, 
-                    y=score_counts.values,
-                    title="⭐ 별점 분포",
-                    labels={'x': '별점', 'y': '리뷰 수'},
-                    color=score_counts.values,
-                    color_continuous_scale='RdYlGn_r'
-                )
-                fig_score.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_score, use_container_width=True)
-            
             with col2:
-                # 카테고리 분포
-                cat_counts = preview['category'].value_counts()
-                fig_cat = px.pie(
-                    values=cat_counts.values,
-                    names=cat_counts.index,
-                    title="📂 문제 범주 분포",
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                fig_cat.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_cat, use_container_width=True)
-            
-            # 긴급도 히스토그램
-            fig_urgency = px.histogram(
-                preview, 
-                x='urgency', 
-                nbins=20,
-                title="🚨 긴급도 분포",
-                labels={'urgency': '긴급도', 'count': '리뷰 수'},
-                color_discrete_sequence=['#667eea']
-            )
-            fig_urgency.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font_family="Arial"
-            )
             st.plotly_chart(fig_urgency, use_container_width=True)
         
-        with subtab2:
+        elif stats_view == "📅 날짜별 분석":
             st.markdown("#### 📅 시간대별 리뷰 분석")
-            
-            # 날짜 데이터 처리
-            preview_with_date = preview.copy()
-            preview_with_date['date'] = pd.to_datetime(preview_with_date['at']).dt.date
-            preview_with_date['hour'] = pd.to_datetime(preview_with_date['at']).dt.hour
-            preview_with_date['weekday'] = pd.to_datetime(preview_with_date['at']).dt.day_name()
+            fig_daily, fig_weekday, fig_hourly, fig_heatmap = build_date_figures(st.session_state.result_key, preview)
             
             col1, col2 = st.columns(2)
-            
             with col1:
-                # 일별 리뷰 수 및 평균 긴급도
-                daily_stats = preview_with_date.groupby('date').agg({
-                    'urgency': ['count', 'mean'],
-                    'score': 'mean'
-                }).round(2)
-                daily_stats.columns = ['리뷰_수', '평균_긴급도', '평균_별점']
-                daily_stats = daily_stats.reset_index()
-                
-                # 일별 리뷰 수와 긴급도
-                fig_daily = go.Figure()
-                fig_daily.add_trace(go.Scatter(
-                    x=daily_stats['date'],
-                    y=daily_stats['리뷰_수'],
-                    mode='lines+markers',
-                    name='리뷰 수',
-                    line=dict(color='#667eea', width=3),
-                    yaxis='y'
-                ))
-                fig_daily.add_trace(go.Scatter(
-                    x=daily_stats['date'],
-                    y=daily_stats['평균_긴급도'],
-                    mode='lines+markers',
-                    name='평균 긴급도',
-                    line=dict(color='#ff6b6b', width=3),
-                    yaxis='y2'
-                ))
-                fig_daily.update_layout(
-                    title="📅 일별 리뷰 수 & 평균 긴급도",
-                    xaxis_title="날짜",
-                    yaxis=dict(title="리뷰 수", side="left"),
-                    yaxis2=dict(title="평균 긴급도", side="right", overlaying="y"),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_daily, use_container_width=True)
-            
             with col2:
-                # 요일별 분포
-                weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                weekday_korean = ['월', '화', '수', '목', '금', '토', '일']
-                weekday_stats = preview_with_date.groupby('weekday')['urgency'].agg(['count', 'mean']).round(2)
-                weekday_stats = weekday_stats.reindex(weekday_order)
-                weekday_stats['weekday_kr'] = weekday_korean
-                
-                fig_weekday = px.bar(
-                    x=weekday_stats['weekday_kr'],
-                    y=weekday_stats['count'],
-                    title="📆 요일별 리뷰 수",
-                    labels={'x': '요일', 'y': '리뷰 수'},
-                    color=weekday_stats['mean'],
-                    color_continuous_scale='Reds'
-                )
-                fig_weekday.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_weekday, use_container_width=True)
-            
-            # 시간대별 분포
-            hourly_stats = preview_with_date.groupby('hour').agg({
-                'urgency': ['count', 'mean']
-            }).round(2)
-            hourly_stats.columns = ['리뷰_수', '평균_긁급도']
-            hourly_stats = hourly_stats.reset_index()
-            
-            fig_hourly = px.line(
-                hourly_stats,
-                x='hour',
-                y='리뷰_수',
-                title="🕐 시간대별 리뷰 분포",
-                labels={'hour': '시간', '리뷰_수': '리뷰 수'},
-                markers=True
-            )
-            fig_hourly.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font_family="Arial"
-            )
             st.plotly_chart(fig_hourly, use_container_width=True)
-            
-            # 날짜별 카테고리 히트맵
-            if len(daily_stats) > 1:
-                date_category = preview_with_date.groupby(['date', 'category']).size().unstack(fill_value=0)
-                
-                fig_heatmap = px.imshow(
-                    date_category.T,
-                    title="🗓️ 날짜별 카테고리 분포 히트맵",
-                    labels=dict(x="날짜", y="카테고리", color="리뷰 수"),
-                    color_continuous_scale='Blues'
-                )
-                fig_heatmap.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
+            if fig_heatmap is not None:
                 st.plotly_chart(fig_heatmap, use_container_width=True)
         
-        with subtab3:
+        else:
             st.markdown("#### 🔍 심화 분석")
+            fig_box, category_stats, fig_scatter, fig_thumbs = build_deep_figures(st.session_state.result_key, preview)
             
             col1, col2 = st.columns(2)
             
             with col1:
-                # 카테고리별 긴급도 박스플롯
-                fig_box = px.box(
-                    preview,
-                    x='category',
-                    y='urgency',
-                    title="📊 카테고리별 긴급도 분포",
-                    labels={'category': '카테고리', 'urgency': '긴급도'},
-                    color='category',
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                fig_box.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_box, use_container_width=True)
                 
-                # 카테고리별 평균 지표
-                category_stats = preview.groupby('category').agg({
-                    'urgency': 'mean',
-                    'score': 'mean',
-                    'thumbsUpCount': 'mean'
-                }).round(2)
-                
                 st.markdown("##### 📋 카테고리별 평균 지표")
                 st.dataframe(
                     category_stats,
@@ -679,51 +747,40 @@ if uploaded_file:
                 )
             
             with col2:
-                # 별점 vs 긴급도 산점도
-                fig_scatter = px.scatter(
-                    preview,
-                    x='score',
-                    y='urgency',
-                    size='thumbsUpCount',
-                    color='category',
-                    title="⭐ 별점 vs 긴급도 관계",
-                    labels={'score': '별점', 'urgency': '긴급도', 'thumbsUpCount': '추천수'},
-                    hover_data=['category']
-                )
-                fig_scatter.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_scatter, use_container_width=True)
-                
-                # 추천수 구간별 분석
-                preview['thumbs_range'] = pd.cut(
-                    preview['thumbsUpCount'], 
-                    bins=[0, 10, 50, 100, float('inf')], 
-                    labels=['~10', '11~50', '51~100', '100+']
-                )
-                
-                thumbs_stats = preview.groupby('thumbs_range').agg({
-                    'urgency': 'mean',
-                    'score': 'mean'
-                }).round(2)
-                
-                fig_thumbs = px.bar(
-                    x=thumbs_stats.index,
-                    y=thumbs_stats['urgency'],
-                    title="👍 추천수 구간별 평균 긴급도",
-                    labels={'x': '추천수 구간', 'y': '평균 긴급도'},
-                    color=thumbs_stats['urgency'],
-                    color_continuous_scale='Reds'
-                )
-                fig_thumbs.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font_family="Arial"
-                )
                 st.plotly_chart(fig_thumbs, use_container_width=True)
 
+    elif view == "📥 내보내기":
+        st.markdown("### 📥 분석 결과 내보내기")
+        st.caption("카테고리 · 긴급도 · 사유와 스타일별 생성 답변을 포함한 전체 분석 결과를 내려받습니다.")
+        
+        replies = load_replies(analysis_key)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("분석된 리뷰", f"{len(preview):,}")
+        with col2:
+            st.metric("생성된 답변", f"{sum(len(r) for r in replies.values()):,}")
+        
+        export_format = st.radio("파일 형식", list(EXPORT_FORMATS), horizontal=True)
+        if st.button("내보내기 파일 생성", type="primary"):
+            try:
+                with st.spinner("📦 내보내기 파일 생성 중..."):
+                    parts = export_results(analysis_key, export_format)
+            except FileNotFoundError as e:
+                st.error(f"❌ {e}")
+            else:
+                if len(parts) > 1:
+                    st.info(f"파일 크기 제한으로 {len(parts)}개 파트로 나뉘었습니다. 링크는 {EXPORT_TTL // 60}분 뒤 만료됩니다.")
+                else:
+                    st.caption(f"다운로드 링크는 {EXPORT_TTL // 60}분 뒤 만료됩니다.")
+                # 정적 파일 서빙으로 디스크에서 바로 스트리밍 다운로드
+                for filename, url in parts:
+                    st.markdown(f"""
+                    <a href="{url}" download="{filename}" style="display: inline-block; padding: 0.5rem 1rem; margin: 0.2rem 0; border-radius: 8px; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); color: white; text-decoration: none; font-weight: 600;">
+                        ⬇️ {filename} 다운로드
+                    </a>
+                    """, unsafe_allow_html=True)
+
 else:
     # 빈 상태 표시
     st.markdown("""
@@ -734,3 +791,15 @@ else:
         <small>필수 컬럼: content, score, thumbsUpCount, at</small>
     </div>
     """, unsafe_allow_html=True)
+
+# 재실행 소요 시간 표시 (뷰별 최근 측정값, secrets의 DEBUG = true일 때만)
+if DEBUG:
+    rerun_ms = (time.perf_counter() - rerun_started) * 1000
+    rerun_label = st.session_state.get('active_view', '-') if uploaded_file else '-'
+    if uploaded_file and st.session_state.get('active_view') == "📊 통계 분석":
+        rerun_label += f" / {st.session_state.get('stats_view', '-')}"
+    st.session_state.setdefault('rerun_latency', {})[rerun_label] = rerun_ms
+    with st.sidebar:
+        with st.expander("⏱️ 재실행 소요 시간"):
+            for label, ms in st.session_state.rerun_latency.items():
+                st.caption(f"{label}: {ms:,.0f} ms")
@@ -0,0 +1,74 @@
+import argparse
+import io
+import statistics
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+# 대시보드 재실행(rerun) 소요 시간 측정 (mock_server.py와 함께 오프라인 실행)
+# OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python bench_rerun.py data/gold_sample.csv --reviews 50
+# AppTest는 파일 업로드를 지원하지 않으므로 st.file_uploader를 지정한 CSV를 돌려주도록 바꿔 실행한다.
+
+
+def patch_uploader(csv_path):
+    data = open(csv_path, "rb").read()
+
+    def file_uploader(*args, **kwargs):
+        f = io.BytesIO(data)
+        f.name = csv_path
+        return f
+
+    st.file_uploader = file_uploader
+
+
+def timed_run(runnable, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at = runnable()
+        samples.append((time.perf_counter() - started) * 1000)
+        assert not at.exception, at.exception
+    return statistics.median(samples)
+
+
+def find_by_label(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 재실행 소요 시간 측정")
+    parser.add_argument("csv", help="업로드할 리뷰 CSV")
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--reviews", type=int, default=50, help="분석할 리뷰 개수 슬라이더 값")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    patch_uploader(args.csv)
+    at = AppTest.from_file(args.app, default_timeout=300)
+    at.secrets["OPENAI_API_KEY"] = "mock"
+
+    started = time.perf_counter()
+    at.run()
+    find_by_label(at.slider, "분석할 리뷰 개수").set_value(args.reviews)
+    at.run()
+    print(f"최초 실행 (분석 포함): {(time.perf_counter() - started) * 1000:,.0f} ms")
+
+    # 뷰 선택기가 있으면 답변 생성 화면으로 이동 (탭 구조에서는 모든 탭이 항상 실행됨)
+    view = next((r for r in at.radio if r.key == "active_view"), None)
+    if view is not None:
+        view.set_value("💬 답변 생성")
+        at.run()
+
+    print(f"단순 재실행: {timed_run(at.run, args.repeat):,.0f} ms")
+    print(f"답변 생성 버튼 클릭: {timed_run(lambda: find_by_label(at.button, 'AI 답변 생성').click().run(), args.repeat):,.0f} ms")
+
+    if view is not None:
+        for stats_view in ["📈 기본 통계", "📅 날짜별 분석", "🔍 심화 분석"]:
+            at.radio(key="active_view").set_value("📊 통계 분석").run()
+            at.radio(key="stats_view").set_value(stats_view).run()
+            print(f"{stats_view} (캐시 적중): {timed_run(at.run, args.repeat):,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# 저장소 루트를 sys.path에 올려 tests/에서 app 모듈(analyzer, export 등)을 임포트할 수 있게 한다
@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import openai
+import pandas as pd
+
+from analyzer import FATAL_ERRORS, parse_category, parse_urgency
+from prompts import ACTIVE_VERSIONS, REPLY_STYLE_GUIDES, REPLY_STYLES, build_messages, get_prompt
+
+# 프롬프트/모델 변형 A-B 평가기
+# 정답 라벨이 달린 리뷰셋을 각 변형으로 동시에 재실행해 정확도 · 긴급도 순위 상관 · 토큰 · 지연 · 비용을 비교한다.
+# 응답은 SQLite에 캐시되므로 같은 변형을 다시 평가할 때는 API를 호출하지 않는다.
+# 오프라인 실행: python mock_server.py & python evaluate.py gold.csv --base-url http://127.0.0.1:8000/v1
+
+# 모델별 100만 토큰당 가격 (USD, 입력 / 출력)
+PRICES = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1-nano': (0.10, 0.40),
+}
+
+
+def parse_variant(text):
+    # 'task:version[:model[:temperature]]' 형식, 생략한 값은 레지스트리 기본값 사용
+    parts = text.split(":")
+    task = parts[0]
+    version = parts[1] if len(parts) > 1 and parts[1] else ACTIVE_VERSIONS[task]
+    spec = dict(get_prompt(task, version))
+    if len(parts) > 2 and parts[2]:
+        spec['model'] = parts[2]
+    if len(parts) > 3 and parts[3]:
+        spec['temperature'] = float(parts[3])
+    name = f"{task}:{version}:{spec['model']}:{spec['temperature']}"
+    return {'name': name, 'task': task, 'version': version, 'spec': spec}
+
+
+class ResponseCache:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, content TEXT, prompt_tokens INTEGER, completion_tokens INTEGER, latency REAL)"
+        )
+
+    @staticmethod
+    def key(base_url, spec, messages):
+        payload = [base_url, spec['model'], spec['temperature'], spec['max_tokens'], messages]
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        row = self.conn.execute(
+            "SELECT content, prompt_tokens, completion_tokens, latency FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'content': row[0], 'prompt_tokens': row[1], 'completion_tokens': row[2], 'latency': row[3], 'cached': True}
+
+    def put(self, key, record):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (key, record['content'], record['prompt_tokens'], record['completion_tokens'], record['latency'])
+        )
+        # 유료 호출 결과가 중단 시에도 남도록 바로 커밋
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def variant_fields(task, gold, reply_style):
+    if task == 'category':
+        return [{'content': c} for c in gold['content'].astype(str)]
+    if task == 'urgency':
+        return [
+            {'content': c, 'score': s, 'thumbs': t}
+            for c, s, t in zip(gold['content'].astype(str), gold['score'].astype(str), gold['thumbsUpCount'].astype(str))
+        ]
+    return [{'content': c, 'style_guide': REPLY_STYLE_GUIDES[reply_style]} for c in gold['content'].astype(str)]
+
+
+async def run_variant(client, cache, semaphore, variant, gold, base_url, reply_style):
+    spec = variant['spec']
+
+    async def call(fields):
+        messages = build_messages(spec, **fields)
+        key = cache.key(base_url, spec, messages)
+        record = cache.get(key)
+        if record is not None:
+            return record
+        try:
+            async with semaphore:
+                started = time.perf_counter()
+                resp = await client.chat.completions.create(
+                    model=spec['model'],
+                    messages=messages,
+                    temperature=spec['temperature'],
+                    max_tokens=spec['max_tokens']
+                )
+                latency = time.perf_counter() - started
+        except FATAL_ERRORS:
+            # 인증 실패 · 권한 없음 · 없는 모델은 모든 요청이 같은 이유로 실패하므로 평가 전체를 중단한다
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ {variant['name']} 요청 실패 - {error}", file=sys.stderr)
+            return {'error': error}
+        record = {
+            'content': resp.choices[0].message.content,
+            'prompt_tokens': resp.usage.prompt_tokens if resp.usage else 0,
+            'completion_tokens': resp.usage.completion_tokens if resp.usage else 0,
+            'latency': latency,
+            'cached': False,
+        }
+        cache.put(key, record)
+        return record
+
+    records = await asyncio.gather(*(call(f) for f in variant_fields(variant['task'], gold, reply_style)))
+    return summarize(variant, gold, records)
+
+
+def summarize(variant, gold, records):
+    spec = variant['spec']
+    ok = [r for r in records if 'error' not in r]
+    errors = [r['error'] for r in records if 'error' in r]
+    prompt_tokens = sum(r['prompt_tokens'] for r in ok)
+    completion_tokens = sum(r['completion_tokens'] for r in ok)
+    latencies = pd.Series([r['latency'] for r in ok], dtype=float) * 1000
+    price_in, price_out = PRICES.get(spec['model'], (float('nan'), float('nan')))
+    cost = (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+    row = {
+        'variant': variant['name'],
+        'task': variant['task'],
+        'reviews': len(records),
+        'errors': len(errors),
+        'last_error': errors[-1] if errors else None,
+        'cache_hits': sum(r['cached'] for r in ok),
+        'avg_prompt_tokens': prompt_tokens / max(len(ok), 1),
+        'avg_completion_tokens': completion_tokens / max(len(ok), 1),
+        'avg_latency_ms': latencies.mean(),
+        'p95_latency_ms': latencies.quantile(0.95),
+        'cost_usd': cost,
+        'cost_per_1k_reviews': cost / max(len(ok), 1) * 1000,
+    }
+
+    if variant['task'] == 'category' and 'gold_category' in gold.columns:
+        preds = pd.Series([None if 'error' in r else parse_category(r['content']) for r in records])
+        row['accuracy'] = (preds.values == gold['gold_category'].astype(str).values).mean()
+    if variant['task'] == 'urgency' and 'gold_urgency' in gold.columns:
+        parsed = [(float('nan'), "분석실패") if 'error' in r else parse_urgency(r['content']) for r in records]
+        preds = pd.Series([u for u, _ in parsed], dtype=float)
+        # 순위 상관(Spearman) = 순위끼리의 피어슨 상관 (scipy 없이 계산)
+        row['spearman'] = preds.rank().corr(gold['gold_urgency'].reset_index(drop=True).astype(float).rank())
+        row['parse_fail_rate'] = sum(reason == "분석실패" for _, reason in parsed) / max(len(parsed), 1)
+    return row
+
+
+async def evaluate(variants, gold, base_url=None, concurrency=8, cache_path=".eval_cache.sqlite",
+                   reply_style=REPLY_STYLES[0]):
+    """모든 변형을 동시에 평가해 변형별 지표 DataFrame을 반환한다."""
+    api_key = os.environ.get("OPENAI_API_KEY") or ("mock" if base_url else None)
+    client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+    cache = ResponseCache(cache_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        rows = await asyncio.gather(*(
+            run_variant(client, cache, semaphore, variant, gold, base_url, reply_style) for variant in variants
+        ))
+    finally:
+        cache.close()
+        await client.close()
+    return pd.DataFrame(rows)
+
+
+def pick_cheapest(report, min_accuracy=None, min_spearman=None):
+    # 품질 기준이 주어진 작업만 추천: 기준을 만족하는 변형 중 리뷰당 비용이 가장 낮은 것
+    # (reply는 자동 품질 지표가 없으므로 추천 대상에서 제외)
+    gates = {'category': ('accuracy', min_accuracy), 'urgency': ('spearman', min_spearman)}
+    picks = {}
+    for task, group in report.groupby('task'):
+        metric, threshold = gates.get(task, (None, None))
+        if threshold is None or metric not in group:
+            continue
+        group = group[(group[metric] >= threshold) & (group['errors'] == 0)]
+        if not group.empty:
+            picks[task] = group.sort_values('cost_per_1k_reviews').iloc[0]['variant']
+    return picks
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="프롬프트/모델 변형 A-B 평가")
+    parser.add_argument("gold", help="정답 CSV (content, score, thumbsUpCount, gold_category, gold_urgency)")
+    parser.add_argument(
+        "--variant", action="append", dest="variants",
+        help="task:version[:model[:temperature]] (반복 지정 가능, 기본: 작업별 현재 버전)"
+    )
+    parser.add_argument("--base-url", help="OpenAI 호환 API 주소 (mock_server.py 등)")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--cache", default=".eval_cache.sqlite", help="응답 캐시 파일")
+    parser.add_argument("--reply-style", default=REPLY_STYLES[0], choices=REPLY_STYLES)
+    parser.add_argument("--min-accuracy", type=float, help="카테고리 정확도 기준")
+    parser.add_argument("--min-spearman", type=float, help="긴급도 순위 상관 기준")
+    parser.add_argument("-o", "--output", help="결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    gold = pd.read_csv(args.gold, encoding="utf-8-sig")
+    variants = [parse_variant(v) for v in (args.variants or list(ACTIVE_VERSIONS))]
+    try:
+        report = asyncio.run(evaluate(
+            variants,
+            gold,
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            cache_path=args.cache,
+            reply_style=args.reply_style
+        ))
+    except FATAL_ERRORS as e:
+        parser.exit(1, f"평가 중단: {type(e).__name__}: {e}\n")
+
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(report.round(4).to_string(index=False))
+    for task, variant in pick_cheapest(report, args.min_accuracy, args.min_spearman).items():
+        print(f"✅ {task}: {variant}")
+    if args.output:
+        report.to_csv(args.output, index=False, encoding="utf-8-sig")
+
+
+if __name__ == "__main__":
+    main()
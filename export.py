@@ -0,0 +1,182 @@
+import json
+import os
+import secrets
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from prompts import REPLY_STYLES
+
+# 분석 결과는 results/<analysis_key>.parquet, 답변 초안은 results/<analysis_key>.replies.jsonl에 저장되며,
+# RESULTS_TTL 동안 사용되지 않은 결과는 다음 저장 때 삭제된다.
+# 내보내기 파일은 Streamlit 정적 파일 서빙 경로(static/exports/<임의 토큰>/)에 청크 단위로 기록되므로
+# 다운로드 시 파일 전체를 Streamlit 프로세스 메모리에 올리지 않는다.
+# 정적 파일 서빙은 200MB를 넘는 파일을 거부하므로 파트 파일로 나누고, 경로는 추측할 수 없는 토큰을 쓰며,
+# EXPORT_TTL이 지난 내보내기는 다음 내보내기 때 삭제한다.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, "results")
+EXPORT_DIR = os.path.join(BASE_DIR, "static", "exports")
+EXPORT_URL = "app/static/exports"
+
+EXPORT_FORMATS = {'CSV': 'csv', 'Parquet': 'parquet', 'JSONL': 'jsonl'}
+EXPORT_CHUNK_SIZE = 10_000
+# Streamlit 정적 파일 상한(200MB)보다 여유 있게: 파트 분할은 직전 청크 크기로 예측하고,
+# Parquet 푸터(row group당 수 KB)는 닫을 때 기록되므로 남는 50MB가 그 오차를 흡수한다
+PART_MAX_BYTES = 150 * 1024 * 1024
+EXPORT_TTL = 60 * 60
+RESULTS_TTL = 7 * 24 * 60 * 60
+# 답변 초안을 분석 결과 행에 연결하는 행 번호 컬럼 (업로드 CSV의 컬럼과 겹치지 않는 이름)
+ROW_ID = "_reviewcare_row_id"
+
+
+def results_path(analysis_key):
+    return os.path.join(RESULTS_DIR, f"{analysis_key}.parquet")
+
+
+def replies_path(analysis_key):
+    return os.path.join(RESULTS_DIR, f"{analysis_key}.replies.jsonl")
+
+
+def save_results(analysis_key, df):
+    cleanup_results()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    # 내보내기 시 iter_batches가 청크 단위로 읽히도록 row group 크기를 맞춘다
+    df.to_parquet(results_path(analysis_key), index=False, row_group_size=EXPORT_CHUNK_SIZE)
+
+
+def delete_results(analysis_key):
+    path = results_path(analysis_key)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def load_results(analysis_key):
+    path = results_path(analysis_key)
+    if not os.path.exists(path):
+        return None
+    # 재사용된 결과는 보존 기간을 갱신한다
+    os.utime(path)
+    return pd.read_parquet(path)
+
+
+def append_reply(analysis_key, review_id, style, answer):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    record = {'review_id': int(review_id), 'style': style, 'answer': answer}
+    with open(replies_path(analysis_key), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_replies(analysis_key):
+    # {스타일: {review_id: 답변}} — 같은 리뷰·스타일은 마지막으로 생성된 답변을 사용
+    replies = {style: {} for style in REPLY_STYLES}
+    path = replies_path(analysis_key)
+    if not os.path.exists(path):
+        return replies
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            replies.setdefault(record['style'], {})[record['review_id']] = record['answer']
+    return replies
+
+
+def cleanup_results(ttl=RESULTS_TTL):
+    # 분석 결과와 답변 초안은 둘 중 최근 수정 시각을 기준으로 함께 삭제한다
+    if not os.path.isdir(RESULTS_DIR):
+        return
+    last_used = {}
+    for name in os.listdir(RESULTS_DIR):
+        for suffix in (".parquet", ".replies.jsonl"):
+            if name.endswith(suffix):
+                key = name[:-len(suffix)]
+                mtime = os.path.getmtime(os.path.join(RESULTS_DIR, name))
+                last_used[key] = max(last_used.get(key, 0.0), mtime)
+    now = time.time()
+    for key, mtime in last_used.items():
+        if now - mtime > ttl:
+            for path in (results_path(key), replies_path(key)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def cleanup_exports(ttl=EXPORT_TTL):
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    now = time.time()
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        if os.path.isdir(path) and now - os.path.getmtime(path) > ttl:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def export_results(analysis_key, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """저장된 분석 결과와 답변 초안을 병합해 내보내기 파트 파일을 만들고 [(파일명, URL), ...]을 반환한다."""
+    if not os.path.exists(results_path(analysis_key)):
+        raise FileNotFoundError("저장된 분석 결과가 없습니다. 리뷰를 다시 분석해주세요.")
+
+    cleanup_exports()
+    ext = EXPORT_FORMATS[fmt]
+    token = secrets.token_urlsafe(16)
+    replies = load_replies(analysis_key)
+    source = pq.ParquetFile(results_path(analysis_key))
+    schema = source.schema_arrow.remove_metadata()
+    for style in REPLY_STYLES:
+        schema = schema.append(pa.field(f"reply_{style}", pa.string()))
+
+    # 임시 디렉터리에 쓴 뒤 이름을 바꿔 작성 중인 파일이 노출되지 않게 한다
+    tmp_dir = os.path.join(EXPORT_DIR, f".{token}.tmp")
+    os.makedirs(tmp_dir)
+    filenames = []
+    f = writer = None
+    last_chunk_bytes = 0
+
+    def open_part():
+        nonlocal f, writer
+        filenames.append(f"reviews_{analysis_key[:12]}_part{len(filenames) + 1:03d}.{ext}")
+        f = open(os.path.join(tmp_dir, filenames[-1]), "wb")
+        writer = pq.ParquetWriter(f, schema) if ext == 'parquet' else None
+        if ext == 'csv':
+            # 파트마다 BOM과 헤더 기록 (엑셀 호환, 파트별 단독 임포트 가능)
+            f.write(("\ufeff" + pd.DataFrame(columns=schema.names).to_csv(index=False)).encode("utf-8"))
+
+    def close_part():
+        if writer is not None:
+            writer.close()
+        f.close()
+
+    try:
+        open_part()
+        for batch in source.iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            for style in REPLY_STYLES:
+                chunk[f"reply_{style}"] = chunk[ROW_ID].map(replies[style]).astype("string")
+
+            # 이번 청크를 쓰면 상한을 넘을 것으로 보이면 새 파트로 넘어간다
+            before = f.tell()
+            if before and before + last_chunk_bytes > PART_MAX_BYTES:
+                close_part()
+                open_part()
+                before = f.tell()
+
+            if writer is not None:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            elif ext == 'csv':
+                f.write(chunk.to_csv(index=False, header=False).encode("utf-8"))
+            else:
+                text = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+                f.write((text if text.endswith("\n") else text + "\n").encode("utf-8"))
+            last_chunk_bytes = f.tell() - before
+        close_part()
+    except BaseException:
+        if f is not None and not f.closed:
+            f.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    os.rename(tmp_dir, os.path.join(EXPORT_DIR, token))
+    return [(name, f"{EXPORT_URL}/{token}/{name}") for name in filenames]
@@ -0,0 +1,118 @@
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 오프라인 평가 / 부하 테스트용 OpenAI 호환 목 서버 (/v1/chat/completions만 지원)
+# 프롬프트 내용에서 결정적으로 응답을 만들어 내므로 같은 입력이면 항상 같은 결과를 돌려준다.
+
+CATEGORY_KEYWORDS = {
+    'BM': ['결제', '과금', '환불', '현질', '가챠', '확률', '유료'],
+    '기술': ['렉', '버그', '튕', '오류', '접속', '서버', '로딩', '크래시'],
+    '운영': ['운영', '공지', '보상', '정지', '제재', '이벤트', '고객센터'],
+    'UX': ['UI', '불편', '조작', '메뉴', '버튼', '화면', '인터페이스'],
+    '콘텐츠': ['스토리', '콘텐츠', '컨텐츠', '캐릭터', '퀘스트', '업데이트', '던전'],
+}
+URGENT_KEYWORDS = ['환불', '먹통', '접속', '결제', '사기', '삭제', '튕']
+
+
+def review_text(prompt):
+    match = re.search(r'리뷰: "(.*)"', prompt, re.S)
+    return match.group(1) if match else prompt
+
+
+def mock_category(prompt):
+    text = review_text(prompt)
+    scores = {cat: sum(text.count(k) for k in keywords) for cat, keywords in CATEGORY_KEYWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else '콘텐츠'
+
+
+def mock_urgency(prompt):
+    text = review_text(prompt)
+    score = re.search(r'리뷰 평점: ([\d.]+)', prompt)
+    thumbs = re.search(r'추천수: (\d+)', prompt)
+    urgency = (5 - float(score.group(1))) / 4 * 0.6 if score else 0.3
+    urgency += min(int(thumbs.group(1)) / 500, 0.2) if thumbs else 0.0
+    urgency += 0.2 if any(k in text for k in URGENT_KEYWORDS) else 0.0
+    urgency = round(min(max(urgency, 0.0), 1.0), 2)
+    return json.dumps({'urgency': urgency, 'reason': "목 서버 규칙 기반 평가"}, ensure_ascii=False)
+
+
+def mock_reply(prompt):
+    return (
+        "안녕하세요, 고객님. 이용에 불편을 드려 진심으로 사과드립니다. "
+        "말씀해 주신 내용은 담당 부서에 전달하여 빠르게 확인하겠습니다. "
+        "추가 문의 사항은 고객센터로 연락해 주시면 신속히 도와드리겠습니다. 감사합니다."
+    )
+
+
+def mock_completion(messages):
+    system = next((m['content'] for m in messages if m['role'] == 'system'), "")
+    prompt = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), "")
+    if "JSON" in system:
+        return mock_urgency(prompt)
+    if "카테고리" in system:
+        return mock_category(prompt)
+    return mock_reply(prompt)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if self.latency:
+            time.sleep(self.latency)
+
+        messages = body.get('messages', [])
+        content = mock_completion(messages)
+        # 토큰 수는 글자 수 기반 근사치
+        prompt_tokens = sum(len(m.get('content', "")) for m in messages) // 2
+        completion_tokens = len(content) // 2
+        payload = json.dumps({
+            'id': f"chatcmpl-mock-{time.time_ns()}",
+            'object': "chat.completion",
+            'created': int(time.time()),
+            'model': body.get('model', "mock"),
+            'choices': [{
+                'index': 0,
+                'message': {'role': "assistant", 'content': content},
+                'finish_reason': "stop",
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 목 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="응답마다 추가할 지연 시간")
+    args = parser.parse_args()
+
+    MockHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    print(f"목 서버 실행 중: http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# 버전별 프롬프트 레지스트리
+# 작업(task)마다 버전별 모델 · 파라미터 · 프롬프트를 등록하고, ACTIVE_VERSIONS에 지정된 버전이
+# 대시보드와 배치 분석에서 사용된다. 새 버전은 기존 버전을 수정하지 말고 추가한 뒤
+# evaluate.py로 비교 평가하고 나서 ACTIVE_VERSIONS를 바꾼다.
+# 템플릿은 str.format으로 채우므로 JSON 예시의 중괄호는 {{ }}로 이스케이프한다.
+
+REPLY_STYLE_GUIDES = {
+    '공감 중심': '이용자의 감정에 최대한 공감하고 불편을 인정하는 답변',
+    '문제 원인 상세': '문제 원인에 대해 상세히 설명하는 답변',
+    '고객센터 안내': '문제를 고객센터에서 도와드릴 수 있다는 안내를 중심으로 작성'
+}
+REPLY_STYLES = list(REPLY_STYLE_GUIDES)
+
+PROMPTS = {
+    'category': {
+        'v1': {
+            'model': "gpt-4o-mini",
+            'temperature': 0.1,
+            'max_tokens': 10,
+            'system': "카테고리 단어만 반환",
+            'template': (
+                "너는 게임 CS 담당자다. 아래 리뷰에 대해 문제의 범주(category)를 'BM', '기술', '운영', 'UX', '콘텐츠' 중 가장 적합한 한 단어로만 반환해라. "
+                "카테고리 외 설명, 문장, 마침표 없이 딱 한 단어만. "
+                "리뷰: \"{content}\""
+            ),
+        },
+    },
+    'urgency': {
+        'v1': {
+            'model': "gpt-4o-mini",
+            'temperature': 0.11,
+            'max_tokens': 200,
+            'system': "예시처럼 JSON만 반환",
+            'template': (
+                "너는 숙련된 게임 CS 분석가다. 아래 게임 리뷰의 전체 내용을 꼼꼼히 읽고, "
+                "별점과 추천수, 그리고 리뷰의 전반적인 맥락과 표현을 바탕으로 '이 리뷰가 게임사에 얼마나 시급하게 대응되어야 할지'를 객관적으로 평가해라. "
+                "특정 키워드가 없어도 맥락상 서비스 안정성, 신뢰성, 금전적 피해, 다수 이용자의 불편, 반복적 신고, 감정적 호소 등 여러 요인을 종합적으로 고려해 시급도를 판단해라. "
+                "별점이 낮거나 추천수가 높거나, 혹은 본문에서 긴급성이 느껴지면 높은 점수를 주고, 단순 의견 또는 반복 이슈가 아니면 낮은 점수를 주라. "
+                "결과는 반드시 아래 예시처럼 JSON만 반환해라. "
+                "예시: {{\"urgency\":0.97,\"reason\":\"1점 리뷰에 많은 추천수가 있고, 환불을 강하게 요청함\"}} "
+                "예시: {{\"urgency\":0.5,\"reason\":\"게임 시스템 건의로, 긴급 대응 필요는 낮음\"}} "
+                "코드블록, 설명, 다른 문구 없이 JSON만 반환.\n"
+                "리뷰 평점: {score}★, 추천수: {thumbs}\n리뷰: \"{content}\""
+            ),
+        },
+    },
+    'reply': {
+        'v1': {
+            'model': "gpt-4o-mini",
+            'temperature': 0.1,
+            'max_tokens': 500,
+            'system': "너는 게임 CS 담당자이며 답변 시 반드시 비공식어를 순화할 것.",
+            'template': (
+                "리뷰: \"{content}\"\n"
+                "답변 스타일: {style_guide}\n"
+                "위 리뷰에 대해 CS 담당자 입장에서 공식적이고 중립적으로 답변하라. "
+                "공감, 사과, 해결방안, 후속 안내를 포함하며, "
+                "'현질', '현금박치기', '쪼렙', '오지게' 등 은어·비속어·비공식/은유적 표현은 반드시 '유료 결제', '과금', '유료 아이템 구매', '초보자', '매우' 등 공식적이고 중립적인 용어로 순화하여 답변하라."
+            ),
+        },
+    },
+}
+
+ACTIVE_VERSIONS = {
+    'category': 'v1',
+    'urgency': 'v1',
+    'reply': 'v1',
+}
+
+
+def get_prompt(task, version=None):
+    version = version or ACTIVE_VERSIONS[task]
+    try:
+        return PROMPTS[task][version]
+    except KeyError:
+        raise KeyError(f"등록되지 않은 프롬프트: {task}:{version}") from None
+
+
+def build_messages(spec, **fields):
+    return [
+        {"role": "system", "content": spec['system']},
+        {"role": "user", "content": spec['template'].format(**fields)}
+    ]
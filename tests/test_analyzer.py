@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+import time
+from types import SimpleNamespace
+
+import openai
+import pandas as pd
+import pytest
+
+import analyzer
+from analyzer import AnalysisError, FileRateLimiter, analyze_reviews
+
+
+def _reserve_slots(path, rps, count, queue):
+    # 시계를 고정하면 예약된 대기 시간이 곧 슬롯 위치가 된다 (자식 프로세스에서만 적용)
+    analyzer.time = SimpleNamespace(time=lambda: 1000.0)
+    limiter = FileRateLimiter(path, rps)
+    for _ in range(count):
+        queue.put(limiter._reserve())
+
+
+@pytest.mark.skipif(analyzer.fcntl is None, reason="파일 잠금(fcntl) 미지원 환경")
+def test_rate_limiter_spaces_slots_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    path = str(tmp_path / "ratelimit")
+    procs = [ctx.Process(target=_reserve_slots, args=(path, 50, 10, queue)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    waits = sorted(queue.get(timeout=10) for _ in range(30))
+    for p in procs:
+        p.join()
+
+    # 세 프로세스가 겹치지 않고 1/rps 간격의 연속된 슬롯 30개를 나눠 가져야 한다
+    assert waits == pytest.approx([k / 50 for k in range(30)])
+
+
+def test_rate_limiter_acquire_waits_for_interval(tmp_path):
+    limiter = FileRateLimiter(str(tmp_path / "ratelimit"), 20)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(11)))
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) >= 10 / 20 * 0.95
+
+
+def test_rate_limiter_without_rps_does_not_wait(tmp_path):
+    limiter = FileRateLimiter(str(tmp_path / "ratelimit"), None)
+    started = time.perf_counter()
+    asyncio.run(limiter.acquire())
+    assert time.perf_counter() - started < 0.05
+
+
+def _api_error(cls):
+    # 분류는 예외 타입만 보므로 HTTP 요청/응답 객체 없이 만든다
+    error = cls.__new__(cls)
+    Exception.__init__(error, "error")
+    return error
+
+
+class FakeClient:
+    def __init__(self, handler):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.handler = handler
+
+    async def _create(self, **kwargs):
+        content = self.handler(kwargs['messages'][-1]['content'], kwargs['messages'][0]['content'])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def close(self):
+        pass
+
+
+def fake_answer(prompt, system):
+    return '{"urgency": 0.9, "reason": "테스트"}' if "JSON" in system else "BM"
+
+
+@pytest.fixture
+def reviews():
+    return pd.DataFrame({
+        'content': ["결제 오류", "너무 긴 리뷰", "접속 불가"],
+        'score': [1, 2, 1],
+        'thumbsUpCount': [10, 0, 5],
+    })
+
+
+def use_handler(monkeypatch, handler):
+    monkeypatch.setattr(openai, "AsyncOpenAI", lambda **kwargs: FakeClient(handler))
+
+
+def test_bad_request_fails_only_that_row(monkeypatch, reviews):
+    def handler(prompt, system):
+        if "너무 긴 리뷰" in prompt:
+            raise _api_error(openai.BadRequestError)
+        return fake_answer(prompt, system)
+
+    use_handler(monkeypatch, handler)
+    out, failed = analyze_reviews(reviews, api_key="test", workers=1)
+
+    assert failed == 1
+    assert out['reason'].tolist() == ["테스트", "분석실패", "테스트"]
+    assert out['category'].tolist() == ["BM", "기타", "BM"]
+
+
+def test_connection_error_is_retried(monkeypatch, reviews):
+    calls = {'n': 0}
+
+    def handler(prompt, system):
+        calls['n'] += 1
+        if calls['n'] == 1:
+            raise _api_error(openai.APIConnectionError)
+        return fake_answer(prompt, system)
+
+    monkeypatch.setattr(analyzer.random, "random", lambda: 0.0)
+    use_handler(monkeypatch, handler)
+    out, failed = analyze_reviews(reviews, api_key="test", workers=1, max_retries=2)
+
+    assert failed == 0
+    assert out['urgency'].tolist() == [0.9, 0.9, 0.9]
+
+
+def test_authentication_error_aborts_run(monkeypatch, reviews):
+    def handler(prompt, system):
+        raise _api_error(openai.AuthenticationError)
+
+    use_handler(monkeypatch, handler)
+    with pytest.raises(AnalysisError, match="AuthenticationError"):
+        analyze_reviews(reviews, api_key="test", workers=1)
+
+
+def test_checkpoints_reuse_completed_shards(monkeypatch, reviews, tmp_path):
+    use_handler(monkeypatch, fake_answer)
+    first, _ = analyze_reviews(reviews, api_key="test", workers=1, chunk_size=2, checkpoint_dir=str(tmp_path))
+
+    def handler(prompt, system):
+        raise AssertionError("체크포인트가 있는 샤드는 다시 호출하지 않아야 한다")
+
+    use_handler(monkeypatch, handler)
+    second, failed = analyze_reviews(reviews, api_key="test", workers=1, chunk_size=2, checkpoint_dir=str(tmp_path))
+
+    assert failed == 0
+    pd.testing.assert_frame_equal(first, second)
@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import export
+from export import ROW_ID, append_reply, cleanup_results, export_results, save_results
+from prompts import REPLY_STYLES
+
+KEY = "a" * 40
+FIRST, SECOND, THIRD = REPLY_STYLES
+
+
+@pytest.fixture(autouse=True)
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "RESULTS_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path / "exports"))
+    return tmp_path
+
+
+@pytest.fixture
+def results():
+    n = 1000
+    df = pd.DataFrame({
+        # 업로드 CSV에 이미 review_id 컬럼이 있어도 행 번호 컬럼과 충돌하지 않아야 한다
+        'review_id': [f"gp:{i}" for i in range(n)],
+        'content': [f"리뷰 내용, \"따옴표\" {i}" for i in range(n)],
+        'score': [i % 5 + 1 for i in range(n)],
+        'urgency': [i / n for i in range(n)],
+    })
+    df.insert(0, ROW_ID, range(n))
+    save_results(KEY, df)
+    append_reply(KEY, 3, FIRST, "첫 답변")
+    append_reply(KEY, 3, FIRST, "다시 생성한 답변")
+    append_reply(KEY, 999, SECOND, "마지막 행 답변")
+    return df
+
+
+def export_paths(parts):
+    return [os.path.join(export.EXPORT_DIR, url.split("/")[-2], name) for name, url in parts]
+
+
+def check_merged(out, results):
+    assert len(out) == len(results)
+    assert out[ROW_ID].tolist() == results[ROW_ID].tolist()
+    assert out['review_id'].tolist() == results['review_id'].tolist()
+    assert out.loc[3, f"reply_{FIRST}"] == "다시 생성한 답변"
+    assert out.loc[999, f"reply_{SECOND}"] == "마지막 행 답변"
+    assert out[f"reply_{FIRST}"].notna().sum() == 1
+    assert out[f"reply_{THIRD}"].isna().all()
+
+
+def test_csv_parts_have_bom_and_header(results, monkeypatch):
+    monkeypatch.setattr(export, "PART_MAX_BYTES", 20_000)
+    parts = export_results(KEY, 'CSV', chunk_size=100)
+
+    assert len(parts) > 1
+    frames = []
+    for path in export_paths(parts):
+        raw = open(path, "rb").read()
+        assert raw.startswith("\ufeff".encode("utf-8"))
+        assert raw.count("\ufeff".encode("utf-8")) == 1
+        frames.append(pd.read_csv(io.BytesIO(raw), encoding="utf-8-sig"))
+    assert all(list(frame.columns) == list(frames[0].columns) for frame in frames)
+    check_merged(pd.concat(frames, ignore_index=True), results)
+
+
+@pytest.mark.parametrize("fmt", ["Parquet", "JSONL"])
+def test_parts_round_trip(results, monkeypatch, fmt):
+    monkeypatch.setattr(export, "PART_MAX_BYTES", 20_000)
+    parts = export_results(KEY, fmt, chunk_size=100)
+
+    assert len(parts) > 1
+    read = pd.read_parquet if fmt == "Parquet" else lambda p: pd.read_json(p, lines=True, dtype=False)
+    check_merged(pd.concat([read(p) for p in export_paths(parts)], ignore_index=True), results)
+
+
+def test_single_part_under_cap(results):
+    parts = export_results(KEY, 'CSV')
+
+    assert len(parts) == 1
+    name, url = parts[0]
+    assert url == f"{export.EXPORT_URL}/{url.split('/')[-2]}/{name}"
+    assert not [d for d in os.listdir(export.EXPORT_DIR) if d.endswith(".tmp")]
+
+
+def test_export_without_results_raises():
+    with pytest.raises(FileNotFoundError):
+        export_results(KEY, 'CSV')
+
+
+def test_cleanup_results_removes_stale_pairs(results):
+    old = time.time() - export.RESULTS_TTL - 60
+    stale, fresh = "b" * 40, "c" * 40
+    for key in (stale, fresh):
+        save_results(key, results)
+        append_reply(key, 0, FIRST, "답변")
+    os.utime(export.results_path(stale), (old, old))
+    os.utime(export.replies_path(stale), (old, old))
+    # 분석 결과는 오래됐어도 답변 초안이 최근에 추가됐으면 함께 보존된다
+    os.utime(export.results_path(fresh), (old, old))
+
+    cleanup_results()
+
+    assert not os.path.exists(export.results_path(stale))
+    assert not os.path.exists(export.replies_path(stale))
+    assert os.path.exists(export.results_path(fresh))
+    assert os.path.exists(export.results_path(KEY))
+    with open(export.replies_path(fresh), encoding="utf-8") as f:
+        assert json.loads(f.readline())['answer'] == "답변"